@@ -20,11 +20,10 @@ positional parameter must be provided. (Values from any ansible.cfg
 files are insufficient.)
 """
 
-import json, sys, re, subprocess, inspect, argparse, os
+import json, sys, re, subprocess, argparse, os, threading
+import collections, concurrent.futures, functools, getpass, pprint
 import ruamel.yaml
-from io import StringIO
 from types import FunctionType
-from inspect import getmembers
 
 if sys.version_info[:2] < (3, 6):
     raise SystemExit(
@@ -56,138 +55,373 @@ args = parser.parse_args()
 if args.vaultid:
     os.environ["ANSIBLE_VAULT_IDENTITY"] = args.vaultid
 
+# Use ansible's vault code in-process when it's importable, which saves
+# starting an ansible-vault subprocess for every call. This imports
+# ansible.constants, which reads ANSIBLE_VAULT_IDENTITY, so it must come
+# after the vaultid argument has been copied there.
+try:
+    from ansible.errors import AnsibleError
+    from ansible.parsing.vault import VaultLib, match_encrypt_secret
+except ImportError:
+    VaultLib = None
+
+# The round-trip loader is slower than a libyaml-backed one, but it is what
+# keeps comments, key order and quoting intact in the filtered text.
 yaml = ruamel.yaml.YAML()
 
+# ansible-vault calls are independent of each other, so run them concurrently.
+max_workers = os.cpu_count() or 1
+executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+
 show_debug_messages = args.verbose
 _pd_prefix = ""
+_pd_lock = threading.Lock()
 
 
-def pd(str, delta=0):
-    global _pd_prefix
-    if delta > 0:
-        _pd_prefix = " " + _pd_prefix
-    elif delta < 0 and len(_pd_prefix):
-        _pd_prefix = _pd_prefix[1:]
-    dbg("{}{}".format(_pd_prefix, str))
-
+def pd(fmt, *fmt_args, delta=0):
+    """Prints fmt.format(*fmt_args) as a debug message at the current depth.
 
-def dbg(msg):
-    if show_debug_messages > len(_pd_prefix):
-        eprint(msg)
+    Nothing is formatted unless the message will be shown, and any lambdas
+    among fmt_args are only called then, so expensive messages cost nothing
+    without -v."""
+    global _pd_prefix
+    with _pd_lock:
+        if delta:
+            _pd_prefix = " " * max(len(_pd_prefix) + delta, 0)
+        if show_debug_messages > len(_pd_prefix):
+            fmt_args = [a() if isinstance(a, FunctionType) else a for a in fmt_args]
+            eprint("{}{}".format(_pd_prefix, fmt.format(*fmt_args)))
 
 
 def eprint(*args, **kwargs):
     print(*args, file=sys.stderr, **kwargs)
 
 
-def lineno():
-    """Returns the line number whence lineno() was called."""
-    return inspect.currentframe().f_back.f_lineno
-
-
-def api(obj):
-    return [
-        name for name in dir(obj) if not name.startswith("built") or name[0] != "@_"
-    ]
-
-
 def attrs(obj):
-    disallowed_properties = {
-        name
-        for name, value in getmembers(type(obj))
-        if isinstance(value, (property, FunctionType))
-    }
-    return "\n".join(
-        [
-            "{}: {}".format(name, getattr(obj, name))
-            for name in api(obj)
-            if name not in disallowed_properties and hasattr(obj, name)
-        ]
+    return "{!r}\n{}".format(obj, pprint.pformat(getattr(obj, "__dict__", {}), depth=2))
+
+
+_vault = None
+_vault_error = None
+_vault_lock = threading.Lock()
+
+
+def vault_lib():
+    """Returns a VaultLib holding the configured vault secrets.
+
+    The secrets are resolved on first use, the same way ansible-vault does,
+    which may run a password script or prompt for a password. A failure is
+    remembered, so later calls exit with it instead of trying again."""
+    global _vault, _vault_error
+    with _vault_lock:
+        if _vault_error is not None:
+            sys.exit(_vault_error)
+        if _vault is None:
+            from ansible import constants as C
+            from ansible.cli import CLI
+            from ansible.parsing.dataloader import DataLoader
+
+            try:
+                secrets = CLI.setup_vault_secrets(
+                    DataLoader(),
+                    vault_ids=C.DEFAULT_VAULT_IDENTITY_LIST,
+                    ask_vault_pass=C.DEFAULT_ASK_VAULT_PASS,
+                    initialize_context=False,
+                )
+            except AnsibleError as e:
+                _vault_error = "Error: {}".format(e)
+            else:
+                if not secrets:
+                    _vault_error = "A vault password is required to use Ansible's Vault"
+            if _vault_error is not None:
+                sys.exit(_vault_error)
+            _vault = VaultLib(secrets)
+    return _vault
+
+
+_vault_passwords = None
+_vault_passwords_error = None
+_vault_passwords_lock = threading.Lock()
+
+
+def read_vault_password(vaultid, source):
+    """Reads a password the way ansible-vault does for "vaultid@source"."""
+    if source in ("prompt", "prompt_ask_vault_pass"):
+        return getpass.getpass("Vault password ({}): ".format(vaultid)).encode()
+    source = os.path.expanduser(source)
+    try:
+        if os.path.isfile(source) and os.access(source, os.X_OK):
+            command = [source]
+            if re.search(r"-client(\.[^.]*)?$", os.path.basename(source)):
+                command += ["--vault-id", vaultid]
+            result = subprocess.run(command, stdout=subprocess.PIPE)
+            if result.returncode != 0:
+                sys.exit("Vault password script {} failed.".format(source))
+            return result.stdout.strip(b"\r\n")
+        with open(source, "rb") as f:
+            return f.read().strip()
+    except OSError as e:
+        sys.exit("Error reading vault password file {}: {}".format(source, e))
+
+
+def vault_passwords():
+    """Returns [(vaultid, password)] for the vault identities in the environment.
+
+    Each source is read once, so password scripts and prompts don't run again
+    in every ansible-vault subprocess. A failure is remembered the same way."""
+    global _vault_passwords, _vault_passwords_error
+    with _vault_passwords_lock:
+        if _vault_passwords_error is not None:
+            sys.exit(_vault_passwords_error)
+        if _vault_passwords is None:
+            # Like ansible, label sources that don't name a vault id with
+            # the default identity.
+            default_id = os.environ.get("ANSIBLE_VAULT_IDENTITY", "default")
+            sources = []
+            for slug in os.environ.get("ANSIBLE_VAULT_IDENTITY_LIST", "").split(","):
+                slug = slug.strip()
+                if "@" in slug:
+                    sources.append(tuple(slug.split("@", 1)))
+                elif slug:
+                    sources.append((default_id, slug))
+            if os.environ.get("ANSIBLE_VAULT_PASSWORD_FILE"):
+                sources.append((default_id, os.environ["ANSIBLE_VAULT_PASSWORD_FILE"]))
+            try:
+                _vault_passwords = [
+                    (vaultid, read_vault_password(vaultid, source))
+                    for vaultid, source in sources
+                ]
+            except SystemExit as e:
+                _vault_passwords_error = e.code
+                raise
+    return _vault_passwords
+
+
+def run_ansible_vault(args, **kwargs):
+    """subprocess.run()s ansible-vault with the already-read vault passwords.
+
+    Each password goes to the child through its own pipe, named with
+    "--vault-id id@/dev/fd/N", in place of the environment variables that
+    would have it read them again."""
+    env = dict(os.environ)
+    env.pop("ANSIBLE_VAULT_IDENTITY_LIST", None)
+    env.pop("ANSIBLE_VAULT_PASSWORD_FILE", None)
+    vault_args = []
+    fds = []
+    try:
+        for vaultid, password in vault_passwords():
+            r, w = os.pipe()
+            fds.append(r)
+            os.write(w, password + b"\n")
+            os.close(w)
+            vault_args += ["--vault-id", "{}@/dev/fd/{}".format(vaultid, r)]
+        return subprocess.run(
+            ["ansible-vault", args[0]] + vault_args + args[1:],
+            env=env,
+            pass_fds=fds,
+            **kwargs
+        )
+    except OSError as e:
+        sys.exit("Error running ansible-vault: {}".format(e))
+    finally:
+        for r in fds:
+            os.close(r)
+
+
+def run_ansible_vault_decrypt(data):
+    result = run_ansible_vault(
+        ["decrypt"],
+        input=data if isinstance(data, (bytes, bytearray)) else str(data).encode(),
+        capture_output=True,
     )
+    if result.returncode != 0:
+        eprint(result.stderr.decode("utf-8", "replace"))
+        sys.exit("ansible-vault decrypt failed.")
+    return result.stdout.decode("utf-8")
 
 
 def ansible_vault_decrypt_string(data):
-    pd("decrypt_string: >> ({})".format(data))
-    try:
-        result = subprocess.run(
-            ["ansible-vault", "decrypt"],
-            input=str(data, encoding="utf-8"),
-            capture_output=True,
-            text=True,
-        )
-        text = str(result.stdout, encoding="utf-8")
-    except TypeError:
-        result = subprocess.run(
-            ["ansible-vault", "decrypt"],
-            input=bytes(str(data), "utf-8"),
-            stdout=subprocess.PIPE,
-        )
-        text = str(result.stdout, encoding="utf-8")
-    pd("decrypt_string: << ({})".format(text))
+    pd("decrypt_string: >> ({})", data)
+    if VaultLib is None:
+        text = run_ansible_vault_decrypt(data)
+    else:
+        try:
+            text = vault_lib().decrypt(str(data)).decode("utf-8")
+        except AnsibleError as e:
+            sys.exit("Error: {}".format(e))
+    pd("decrypt_string: << ({})", text)
     if len(text.splitlines(True)) == 1 and not text.endswith("\n"):
         return text
-    else:
-        if text.endswith("\n\n"):
-            newyml = "- |+\n"
-        elif text.endswith("\n"):
-            newyml = "- |\n"
-        else:
-            newyml = "- |-\n"
-
-    newyml = "".join([newyml] + ["  " + line for line in text.splitlines(True)])
-    pd("decrypt_reprocess: <{}>".format(newyml))
-    newrep = yaml.load(newyml)
-    pd(attrs(newrep[0]))
-    return newrep[0]
-
-
-def ansible_vault_encrypt_string(key, data):
-    pd("encrypt_string: ({})".format(data))
-    if "ANSIBLE_VAULT_IDENTITY" not in os.environ:
-        eprint("ANSIBLE_VAULT_IDENTITY not set and no vaultid given.")
-        sys.exit("ANSIBLE_VAULT_IDENTITY not set and no vaultid given.")
-    try:
-        result = subprocess.run(
+    # Emitted as a "|" block scalar; ruamel.yaml picks the "|-"/"|+"
+    # chomping indicator from the text's trailing newlines.
+    ss = ruamel.yaml.scalarstring.LiteralScalarString(text)
+    pd("{}", lambda: attrs(ss))
+    return ss
+
+
+def run_ansible_vault_encrypt_string(values):
+    """Encrypts each of values with its own ansible-vault invocation.
+
+    Values go in on stdin, never on the command line where other users
+    could read them from the process list.
+    Returns the vault text of each value, in the same order as values."""
+    texts = []
+    for value in values:
+        result = run_ansible_vault(
             [
-                "ansible-vault",
                 "encrypt_string",
                 "--encrypt-vault-id",
                 os.environ["ANSIBLE_VAULT_IDENTITY"],
                 "--stdin-name",
-                key if key else "",
+                "",
             ],
-            input=data,
+            input=str(value),
             capture_output=True,
             text=True,
         )
-        text = result.stdout
-    except TypeError:
-        result = subprocess.run(
-            [
-                "ansible-vault",
-                "encrypt_string",
-                "--encrypt-vault-id",
-                os.environ["ANSIBLE_VAULT_IDENTITY"],
-                "--stdin-name",
-                key if key else "",
-            ],
-            input=bytes(str(data), "utf-8"),
-            stdout=subprocess.PIPE,
+        if result.returncode != 0:
+            eprint(result.stderr)
+            sys.exit("ansible-vault encrypt_string failed.")
+        pd("raw_result: {}", result.stdout)  # starts with "!vault |\n"
+        texts.append(
+            "\n".join(line.lstrip() for line in result.stdout.splitlines()[1:]) + "\n"
         )
-        text = str(result.stdout, encoding="utf-8")
-    pd("raw_result: " + text)  # starts with "!vault |\n"
-    text2 = "\n".join([l.lstrip() for l in text.splitlines()[1:]]) + "\n"
-    ts = ruamel.yaml.comments.TaggedScalar(text2, tag="!vault", style="|")
-    # ts = ruamel.yaml.comments.TaggedScalar(text, tag='!vault', style='|')
-    # setattr(ts,'style','|')
-    # setattr(ts,'_yaml_tag', ruamel.yaml.comments.Tag())
-    # getattr(ts,'_yaml_tag').value = '!vault'
-    pd("cooked_result1: {}".format(ts))
-    return ts
+    return texts
+
+
+def ansible_vault_encrypt_strings(values):
+    """Encrypts all values with the ANSIBLE_VAULT_IDENTITY vault id, which
+    the caller has checked is set.
+
+    Returns a list of TaggedScalars in the same order as values."""
+    pd("encrypt_strings: ({})", values)
+    if VaultLib is None:
+        texts = run_ansible_vault_encrypt_string(values)
+    else:
+        vault = vault_lib()
+        try:
+            vaultid, secret = match_encrypt_secret(
+                vault.secrets, encrypt_vault_id=os.environ["ANSIBLE_VAULT_IDENTITY"]
+            )
+            texts = [
+                vault.encrypt(str(value), secret, vault_id=vaultid).decode("utf-8")
+                for value in values
+            ]
+        except AnsibleError as e:
+            sys.exit("Error: {}".format(e))
+    tss = [
+        ruamel.yaml.comments.TaggedScalar(text, tag="!vault", style="|")
+        for text in texts
+    ]
+    pd("cooked_result1: {}", tss)
+    return tss
+
+
+def vault_id_of(ciphertext):
+    """Returns the vault id from a "$ANSIBLE_VAULT;1.2;AES256;<id>" header."""
+    header = ciphertext.split("\n", 1)[0].split(";")
+    return header[3].strip() if len(header) > 3 else "default"
+
+
+@functools.lru_cache(maxsize=4096)
+def decrypt_future(ciphertext):
+    """Starts decrypting ciphertext, sharing the work among identical values.
+
+    Only called from the main thread, so the cache itself needs no lock."""
+    return executor.submit(ansible_vault_decrypt_string, ciphertext)
+
+
+# (container, key, ciphertext, future) for every !vault value found by
+# walk(); the futures are started during the walk and collected by
+# decrypt_pending().
+pending_decrypts = []
+
+# (container, key, plaintext) for every string found by walk(),
+# encrypted together by encrypt_pending() once the walk is done.
+pending_encrypts = []
+
+# plaintext -> ciphertext under the encryption vault id, for every value
+# decrypted or encrypted during this run, so encrypt_pending() can reuse it.
+vault_texts = {}
+
+
+def decrypt_pending():
+    vaultid = os.environ.get("ANSIBLE_VAULT_IDENTITY")
+    for data, key, ciphertext, future in pending_decrypts:
+        pd("\n=== before ===\n{}\n--------------\n", lambda: attrs(data[key]))
+        data[key] = future.result()
+        pd("\n=== after  ===\n{}\n--------------\n", lambda: attrs(data[key]))
+        if vault_id_of(ciphertext) == vaultid:
+            vault_texts.setdefault(str(data[key]), ciphertext)
+    del pending_decrypts[:]
+
+
+def encrypt_pending():
+    # Each distinct plaintext is encrypted once, and not at all if we've
+    # already seen it vaulted; re-encrypting would only produce a different
+    # ciphertext for the same value. Every ciphertext carries its own salt,
+    # so sharing one between locations is safe.
+    values = list(
+        {
+            str(value): None
+            for _, _, value in pending_encrypts
+            if str(value) not in vault_texts
+        }
+    )
+    if values:
+        if "ANSIBLE_VAULT_IDENTITY" not in os.environ:
+            eprint("ANSIBLE_VAULT_IDENTITY not set and no vaultid given.")
+            sys.exit("ANSIBLE_VAULT_IDENTITY not set and no vaultid given.")
+        # One batch per worker, so the key derivations (or, without ansible
+        # importable, the ansible-vault runs) proceed in parallel.
+        size = -(-len(values) // max_workers)
+        futures = [
+            executor.submit(ansible_vault_encrypt_strings, values[i : i + size])
+            for i in range(0, len(values), size)
+        ]
+        tss = [ts for future in futures for ts in future.result()]
+        vault_texts.update(zip(values, (str(ts) for ts in tss)))
+    for data, key, value in pending_encrypts:
+        pd("\n=== before ===\n{}\n--------------\n", lambda: attrs(data[key]))
+        # A TaggedScalar per location: ruamel.yaml would turn a shared
+        # object into an anchor and aliases.
+        data[key] = ruamel.yaml.comments.TaggedScalar(
+            vault_texts[str(value)], tag="!vault", style="|"
+        )
+        pd("\n=== after  ===\n{}\n--------------\n", lambda: attrs(data[key]))
+    del pending_encrypts[:]
+
+
+class IndentedWriter:
+    """Writes to stream with indent inserted at the start of every line."""
+
+    def __init__(self, stream, indent):
+        self.stream = stream
+        self.indent = indent
+        self.at_line_start = True
+        # ruamel.yaml writes str, rather than encoded bytes, to streams that
+        # have an encoding.
+        self.encoding = stream.encoding
+
+    def write(self, text):
+        if not text:
+            return
+        if self.at_line_start:
+            text = self.indent + text
+        # A trailing newline's line is indented by whichever write starts it.
+        self.at_line_start = text.endswith("\n")
+        if self.at_line_start:
+            text = text[:-1].replace("\n", "\n" + self.indent) + "\n"
+        else:
+            text = text.replace("\n", "\n" + self.indent)
+        self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
 
 
 def what_is(data):
-    pd("what_is({})".format(data))
+    pd("what_is({})", data)
     sys.exit("Error: expected 'key: value' pair; found {}".format(data))
     return
 
@@ -199,57 +433,81 @@ def type_or_str(term):
         return type(term)
 
 
+VAULT_TAG = "!vault"
+
+
+# Handlers for one value found by walk(); data[key] is value. Handlers for
+# containers return them so walk() can queue them in turn.
+def handle_tagged(data, key, value):
+    try:
+        is_vault = value._yaml_tag.value == VAULT_TAG
+    except AttributeError:
+        is_vault = False
+    if is_vault:
+        pd("handle_tagged: queued for decryption: key={}", key)
+        ciphertext = str(value)
+        pending_decrypts.append((data, key, ciphertext, decrypt_future(ciphertext)))
+    else:
+        what_is(value)
+
+
+def handle_str(data, key, value):
+    pd("handle_str: queued for encryption: key={}", key)
+    pending_encrypts.append((data, key, value))
+
+
+def handle_container(data, key, value):
+    return value
+
+
+def handle_other(data, key, value):
+    for cls, handler in (
+        (ruamel.yaml.comments.TaggedScalar, handle_tagged),
+        (str, handle_str),
+        ((dict, list), handle_container),
+    ):
+        if isinstance(value, cls):
+            return handler(data, key, value)
+    what_is(value)
+
+
+# The types ruamel.yaml's round-trip loader produces, so that most values
+# are dispatched with one lookup; anything else goes through handle_other.
+HANDLERS = {
+    ruamel.yaml.comments.TaggedScalar: handle_tagged,
+    ruamel.yaml.comments.CommentedMap: handle_container,
+    ruamel.yaml.comments.CommentedSeq: handle_container,
+    ruamel.yaml.scalarstring.LiteralScalarString: handle_str,
+    ruamel.yaml.scalarstring.FoldedScalarString: handle_str,
+    str: handle_str,
+    dict: handle_container,
+    list: handle_container,
+}
+
+
 # walk yaml and report types
-def walk_dict(data, level):
-    pd(">>>walk_dict[{}]:({})\n::{}".format(lineno(), type_or_str(data), data), 1)
-    for key in data:
-        pd(
-            "walk_dict: key={}, type={}, value={}".format(
-                key, type(data[key]), data[key]
-            )
-        )
-        if (
-            isinstance(data[key], ruamel.yaml.comments.TaggedScalar)
-            and getattr(data[key], "_yaml_tag").value == "!vault"
-        ):
-            pd("\n=== before ===\n" + attrs(data[key]) + "\n--------------\n")
-            data[key] = ansible_vault_decrypt_string(data[key])
-            pd("\n=== after  ===\n" + attrs(data[key]) + "\n--------------\n")
-        elif isinstance(data[key], str):
-            pd("\n=== before ===\n" + attrs(data[key]) + "\n--------------\n")
-            data[key] = ansible_vault_encrypt_string(None, data[key])
-            pd("\n=== after  ===\n" + attrs(data[key]) + "\n--------------\n")
-        elif isinstance(data[key], dict):
-            walk_dict(data[key], level + 1)
-        elif isinstance(data[key], list):
-            walk_list(data[key], level + 1)
-        else:
-            what_is(data[key])
-    pd("<<<walk_dict[{}]:".format(lineno()), -1)
-
-
-def walk_list(data, level):
-    pd(">>>walk_list[{}]:({})\n::{}".format(lineno(), type_or_str(data), data), 1)
-    for idx, value in enumerate(data):
-        pd("walk_list: value type={}".format(type(value)))
-        if (
-            isinstance(value, ruamel.yaml.comments.TaggedScalar)
-            and getattr(value, "_yaml_tag").value == "!vault"
-        ):
-            pd("\n=== before ===\n" + attrs(data[idx]) + "\n--------------\n")
-            data[idx] = ansible_vault_decrypt_string(value)
-            pd("\n=== after  ===\n" + attrs(data[idx]) + "\n--------------\n")
-        elif isinstance(value, dict):
-            walk_dict(value, level + 1)
-        elif isinstance(value, list):
-            walk_list(value, level + 1)
-        elif isinstance(value, str):
-            pd("\n=== before ===\n" + attrs(data[idx]) + "\n--------------\n")
-            data[idx] = ansible_vault_encrypt_string(None, value)
-            pd("\n=== after  ===\n" + attrs(data[idx]) + "\n--------------\n")
-        else:
-            what_is(data[idx])
-    pd("<<<walk_list[{}]:".format(lineno()), -1)
+def walk(data):
+    """Decrypts or encrypts every value in data, a dict or list.
+
+    Nested containers go on a worklist instead of being recursed into, so
+    the walk costs no stack frames per level of nesting."""
+    worklist = collections.deque([(data, 1)])
+    depth = 0
+    while worklist:
+        data, level = worklist.popleft()
+        pd(">>>walk:({})\n::{}", type_or_str(data), data, delta=level - depth)
+        depth = level
+        for key, value in data.items() if isinstance(data, dict) else enumerate(data):
+            pd("walk: key={}, type={}, value={}", key, type(value), value)
+            child = HANDLERS.get(type(value), handle_other)(data, key, value)
+            if child is not None:
+                worklist.append((child, level + 1))
+    # Finish the vault work one level in: its messages show plaintext, and
+    # should need -vv as they did when the walk was recursive.
+    pd("walk: collecting results", delta=1 - depth)
+    decrypt_pending()
+    encrypt_pending()
+    pd("<<<walk:", delta=-1)
 
 
 # @ruamel.yaml.yaml_object(yaml)
@@ -279,23 +537,28 @@ yaml.explicit_start = False
 yaml.default_flow_style = False
 yaml.indent(mapping=2, sequence=4, offset=2)
 
-lines = sys.stdin.read()
+# Peek at the input's indentation without consuming it, so ruamel.yaml can
+# read (and decode) stdin's bytes as a stream.
+head = sys.stdin.buffer.peek(64).split(b"\n", 1)[0]
+first_line_indent = len(head) - len(head.lstrip(b" "))
 
-first_line_indent = 0
-while first_line_indent < len(lines) and lines[first_line_indent] == " ":
-    first_line_indent += 1
 
-data = yaml.load(lines)
-
-if isinstance(data, dict):
-    walk_dict(data, 0)
-elif isinstance(data, list):
-    walk_list(data, 0)
-else:
-    what_is(data)
-
-string_stream = StringIO()
-yaml.dump(data, string_stream)
-
-for line in string_stream.getvalue().splitlines():
-    print("{}{}".format(" " * first_line_indent, line))
+def processed(documents):
+    """Yields each document once its values are encrypted/decrypted."""
+    for data in documents:
+        if isinstance(data, (dict, list)):
+            walk(data)
+        else:
+            what_is(data)
+        yield data
+
+
+out = sys.stdout
+if first_line_indent:
+    out = IndentedWriter(sys.stdout, " " * first_line_indent)
+try:
+    yaml.dump_all(processed(yaml.load_all(sys.stdin.buffer)), out)
+finally:
+    # After an error, drop the queued ansible-vault work instead of running
+    # it all on the way out.
+    executor.shutdown(cancel_futures=True)